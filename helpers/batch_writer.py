@@ -0,0 +1,90 @@
+"""Batched background inserts for MongoDB collections."""
+
+import asyncio
+from typing import Callable, Optional
+from bson import ObjectId
+from pymongo import InsertOne
+from pymongo.asynchronous.collection import AsyncCollection
+
+
+class BatchInsertWriter:
+    """Queue documents and insert them in batches with a single bulk write.
+
+    Documents get their ``_id`` assigned up front, so callers can return it
+    right away while the insert is flushed in the background, either every
+    ``flush_interval`` seconds or as soon as ``max_batch_size`` are pending.
+    """
+
+    def __init__(
+        self,
+        get_collection: Callable[[], AsyncCollection],
+        max_batch_size: int = 100,
+        flush_interval: float = 0.05,
+    ):
+        self._get_collection = get_collection
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, document: dict) -> ObjectId:
+        """Queue a document for insertion and return its ``_id``.
+
+        The document is not written yet when this returns: reads issued right
+        away may not find it, and a failed write is only logged.
+        """
+        document.setdefault("_id", ObjectId())
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._queue.put_nowait(document)
+        return document["_id"]
+
+    async def _run(self):
+        """Drain the queue in batches until a stop sentinel is received."""
+        loop = asyncio.get_running_loop()
+        while True:
+            document = await self._queue.get()
+            if document is None:
+                return
+            batch = [document]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    document = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if document is None:
+                    await self._write(batch)
+                    return
+                batch.append(document)
+            await self._write(batch)
+
+    async def _write(self, batch: list[dict]):
+        """Insert a batch of documents with one unordered bulk write."""
+        try:
+            await self._get_collection().bulk_write(
+                [InsertOne(document) for document in batch], ordered=False
+            )
+        except Exception as e:
+            # Never let one bad batch stop the writer task
+            print(f"Error writing batch of {len(batch)} documents: {e}")
+
+    async def close(self):
+        """Flush any queued documents and stop the background task."""
+        if self._task is not None and not self._task.done():
+            self._queue.put_nowait(None)
+            await self._task
+        self._task = None
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                document = self._queue.get_nowait()
+                if document is not None:
+                    pending.append(document)
+            if pending:
+                await self._write(pending)
@@ -0,0 +1,29 @@
+"""Application configuration loaded once from the environment."""
+
+import os
+from typing import Final, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MONGODB_URI: Final[Optional[str]] = os.getenv("MONGODB_URI")
+REPLICATE_API_KEY: Final[Optional[str]] = os.getenv("REPLICATE_API_KEY")
+RAPID_API_KEY: Final[Optional[str]] = os.getenv("RAPID_API_KEY")
+
+# Comma-separated list of origins allowed to call the API
+ALLOWED_ORIGINS: Final[list[str]] = [
+    origin.strip()
+    for origin in os.getenv("ALLOWED_ORIGINS", "*").split(",")
+    if origin.strip()
+]
+
+# Connection pool settings for the MongoDB client
+MONGODB_MAX_POOL_SIZE: Final[int] = int(os.getenv("MONGODB_MAX_POOL_SIZE", "200"))
+MONGODB_MIN_POOL_SIZE: Final[int] = int(os.getenv("MONGODB_MIN_POOL_SIZE", "20"))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS: Final[int] = int(
+    os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "2000")
+)
+MONGODB_MAX_IDLE_TIME_MS: Final[int] = int(
+    os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000")
+)
+MONGODB_COMPRESSORS: Final[str] = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
@@ -1,15 +1,72 @@
 """Database helper module for MongoDB connections."""
 
-import os
-from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import threading
+from typing import Optional
+from pymongo import AsyncMongoClient
+from helpers.config import (
+    MONGODB_COMPRESSORS,
+    MONGODB_MAX_IDLE_TIME_MS,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+    MONGODB_URI,
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+)
 
-load_dotenv()
+# One client (and therefore one connection pool) per URI and event loop
+_ClientKey = tuple[Optional[str], Optional[asyncio.AbstractEventLoop]]
+_clients: dict[_ClientKey, AsyncMongoClient] = {}
+_clients_lock = threading.Lock()
 
-MONGODB_URI = os.getenv("MONGODB_URI")
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Return the running event loop, or None when called outside of one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _drop_closed_loops():
+    """Forget clients whose event loop has been closed; call with the lock held."""
+    for key in [key for key in _clients if key[1] is not None and key[1].is_closed()]:
+        del _clients[key]
+
+
+def get_client(uri: Optional[str] = MONGODB_URI) -> AsyncMongoClient:
+    """Get the cached MongoDB client for the given URI and current event loop."""
+    key = (uri, _current_loop())
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                _drop_closed_loops()
+                client = AsyncMongoClient(
+                    uri,
+                    maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                    minPoolSize=MONGODB_MIN_POOL_SIZE,
+                    maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+                    waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                    compressors=MONGODB_COMPRESSORS,
+                    retryWrites=True,
+                    appname="fastapi-app",
+                )
+                _clients[key] = client
+    return client
 
 
 def get_database(db_name: str):
     """Get a MongoDB database instance."""
-    client = AsyncIOMotorClient(MONGODB_URI)
-    return client[db_name]
+    return get_client()[db_name]
+
+
+async def close_clients():
+    """Close the cached MongoDB clients that belong to the running event loop."""
+    loop = _current_loop()
+    with _clients_lock:
+        keys = [key for key in _clients if key[1] is loop]
+        clients = [_clients.pop(key) for key in keys]
+        _drop_closed_loops()
+    for client in clients:
+        await client.close()
@@ -0,0 +1,49 @@
+"""Pydantic type and decoding helpers for MongoDB ObjectIds."""
+
+from typing import Annotated, Any
+from bson import ObjectId
+from bson.codec_options import TypeDecoder, TypeRegistry
+from pydantic import PlainSerializer, PlainValidator, WithJsonSchema
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+
+
+def _validate_object_id(value: Any) -> ObjectId:
+    """Convert a value to an ObjectId, rejecting malformed ids."""
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    raise ValueError("Invalid ObjectId")
+
+
+PyObjectId = Annotated[
+    ObjectId,
+    PlainValidator(_validate_object_id),
+    PlainSerializer(str, return_type=str),
+    WithJsonSchema({"type": "string", "pattern": "^[0-9a-fA-F]{24}$"}),
+]
+
+
+class ObjectIdToStrDecoder(TypeDecoder):
+    """Decode every BSON ObjectId, nested ones included, to its hex string."""
+
+    bson_type = ObjectId
+
+    def transform_bson(self, value: ObjectId) -> str:
+        return str(value)
+
+
+_STR_OBJECT_ID_TYPE_REGISTRY = TypeRegistry([ObjectIdToStrDecoder()])
+
+
+def get_str_id_collection(db: AsyncDatabase, name: str) -> AsyncCollection:
+    """Get a collection whose documents come back with string ObjectIds.
+
+    The database's own codec options (tz_aware, uuidRepresentation, ...) are
+    kept; only the type registry is replaced.
+    """
+    codec_options = db.codec_options.with_options(
+        type_registry=_STR_OBJECT_ID_TYPE_REGISTRY
+    )
+    return db.get_collection(name, codec_options=codec_options)
@@ -1,26 +1,71 @@
 """FastAPI App"""
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from helpers.config import ALLOWED_ORIGINS
+from helpers.db import close_clients
 from routes.movies import router as movies_router
-from routes.insta_scraper import router as insta_scraper_router
-from routes.image_gen import router as image_gen_router
+from routes.insta_scraper import (
+    close_http_client,
+    create_indexes as create_insta_scraper_indexes,
+    router as insta_scraper_router,
+)
+from routes.image_gen import (
+    close_image_writer,
+    create_indexes as create_image_gen_indexes,
+    router as image_gen_router,
+)
+
+
+async def create_indexes():
+    """Create the database indexes used by the routes."""
+    await create_image_gen_indexes()
+    await create_insta_scraper_indexes()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Prepare database indexes on startup and release clients on shutdown."""
+    if "*" in ALLOWED_ORIGINS:
+        print(
+            "Warning: ALLOWED_ORIGINS is '*' (the default when unset); allowing "
+            "any origin without credentials. Set it to the frontend origins "
+            "to allow cookies."
+        )
+    # Build indexes in the background so the app still starts without MongoDB
+    index_task = asyncio.create_task(create_indexes())
+    yield
+    index_task.cancel()
+    await close_image_writer()
+    await close_clients()
+    await close_http_client()
+
 
 app = FastAPI(
     title="FastAPI App",
     description="A FastAPI application for managing routes",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware for frontend integration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=ALLOWED_ORIGINS,
+    # Browsers reject credentialed requests to a wildcard origin
+    allow_credentials="*" not in ALLOWED_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress large JSON listings such as /movies and /generations
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include the routes
 app.include_router(movies_router, prefix="/api/v1", tags=["movies"])
 app.include_router(insta_scraper_router, prefix="/api/v1", tags=["instagram"])
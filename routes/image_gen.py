@@ -1,27 +1,53 @@
 """Image generation route."""
 
 import os
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Optional
 import replicate
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import PyMongoError
-from dotenv import load_dotenv
 from bson import ObjectId
+from helpers.config import REPLICATE_API_KEY
+from helpers.batch_writer import BatchInsertWriter
 from helpers.db import get_database
-
-load_dotenv()
+from helpers.object_id import PyObjectId, get_str_id_collection
 
 router = APIRouter()
 
-REPLICATE_API_KEY = os.getenv("REPLICATE_API_KEY")
-
 # Set the API key for replicate
 if REPLICATE_API_KEY:
     os.environ["REPLICATE_API_TOKEN"] = REPLICATE_API_KEY
 
-db = get_database("images_gen")
+DB_NAME = "images_gen"
+
+IMAGE_LIST_PROJECTION = {"_id": 1, "output_url": 1, "created_at": 1}
+
+# Matches the /generations sort and holds every projected field, so the
+# planner can cover the listing and its pagination filter with it
+IMAGE_LIST_INDEX = [
+    ("created_at", DESCENDING),
+    ("_id", DESCENDING),
+    ("output_url", ASCENDING),
+]
+
+# Generated images are inserted in batches in the background
+image_writer = BatchInsertWriter(lambda: get_database(DB_NAME).images)
+
+
+async def create_indexes():
+    """Create the indexes used by the image generation routes."""
+    db = get_database(DB_NAME)
+    try:
+        await db.images.create_index(IMAGE_LIST_INDEX)
+    except PyMongoError as e:
+        print(f"Warning: could not create image generation indexes: {e}")
+
+
+async def close_image_writer():
+    """Flush pending image inserts."""
+    await image_writer.close()
 
 
 class ImageGenerationRequest(BaseModel):
@@ -53,26 +79,28 @@ class Gen4ImageRequest(BaseModel):
 def extract_url_from_output(output):
     """Extract URL string from various output types."""
     try:
-        # Check if it's a FileOutput object
-        if hasattr(output, "url"):
+        # Common case: a FileOutput object
+        try:
             return str(output.url)
+        except AttributeError:
+            pass
 
         # Check if it's already a string
         if isinstance(output, str):
             return output
 
-        # Check if it's a list
-        if isinstance(output, list) and len(output) > 0:
+        # Check if it's a non-empty list
+        if type(output) is list and output:
             first_item = output[0]
-            if hasattr(first_item, "url"):
+            try:
                 return str(first_item.url)
-            else:
+            except AttributeError:
                 return str(first_item)
 
         # Fallback
         return str(output)
 
-    except (AttributeError, TypeError, IndexError, ValueError) as e:
+    except (TypeError, ValueError) as e:
         print(f"Error extracting URL: {e}")
         return str(output)
 
@@ -107,9 +135,11 @@ async def generate_image(request: ImageGenerationRequest):
 
         print(f"Input data: {input_data}")
 
-        # Run the model using replicate.run()
+        # Run the model with replicate's async client
         # output = replicate.run("black-forest-labs/flux-kontext-pro", input=input_data)
-        output = replicate.run("black-forest-labs/flux-kontext-max", input=input_data)
+        output = await replicate.async_run(
+            "black-forest-labs/flux-kontext-max", input=input_data
+        )
         # Note: Using flux-kontext-max for better performance
         # You can switch back to flux-kontext-pro if needed
 
@@ -127,17 +157,17 @@ async def generate_image(request: ImageGenerationRequest):
             "output_format": request.output_format,
             "output_url": output_url,
             "model": "black-forest-labs/flux-kontext-pro",
-            "created_at": datetime.utcnow(),
+            "created_at": datetime.now(UTC),
             "status": "completed",
         }
 
-        result = await db.images.insert_one(image_data)
+        image_id = image_writer.submit(image_data)
 
         return {
             "image_url": output_url,
             "message": "Image generated successfully with Flux Kontext Pro",
             "success": True,
-            "id": str(result.inserted_id),
+            "id": str(image_id),
         }
 
     except replicate.exceptions.ReplicateError as e:
@@ -169,8 +199,8 @@ async def generate_google_image(request: GoogleImageRequest):
 
         print(f"Input data: {input_data}")
 
-        # Run the model using replicate.run()
-        output = replicate.run("google/imagen-4", input=input_data)
+        # Run the model with replicate's async client
+        output = await replicate.async_run("google/imagen-4", input=input_data)
 
         print(f"Output: {output}")
 
@@ -186,17 +216,17 @@ async def generate_google_image(request: GoogleImageRequest):
             "aspect_ratio": request.aspect_ratio,
             "output_url": output_url,
             "model": "google/imagen",
-            "created_at": datetime.utcnow(),
+            "created_at": datetime.now(UTC),
             "status": "completed",
         }
 
-        result = await db.images.insert_one(image_data)
+        image_id = image_writer.submit(image_data)
 
         return {
             "image_url": output_url,
             "message": "Image generated successfully with Google Imagen",
             "success": True,
-            "id": str(result.inserted_id),
+            "id": str(image_id),
         }
     except replicate.exceptions.ReplicateError as e:
         return {
@@ -231,8 +261,8 @@ async def generate_gen4_image(request: Gen4ImageRequest):
 
         print(f"Input data: {input_data}")
 
-        # Run the model using replicate.run()
-        output = replicate.run("runwayml/gen4-image", input=input_data)
+        # Run the model with replicate's async client
+        output = await replicate.async_run("runwayml/gen4-image", input=input_data)
 
         print(f"Output: {output}")
 
@@ -249,17 +279,17 @@ async def generate_gen4_image(request: Gen4ImageRequest):
             "reference_images": request.reference_images,
             "output_url": output_url,
             "model": "runwayml/gen4-image",
-            "created_at": datetime.utcnow(),
+            "created_at": datetime.now(UTC),
             "status": "completed",
         }
 
-        result = await db.images.insert_one(image_data)
+        image_id = image_writer.submit(image_data)
 
         return {
             "image_url": output_url,
             "message": "Image generated successfully with RunwayML Gen4",
             "success": True,
-            "id": str(result.inserted_id),
+            "id": str(image_id),
         }
 
     except replicate.exceptions.ReplicateError as e:
@@ -270,27 +300,68 @@ async def generate_gen4_image(request: Gen4ImageRequest):
         }
 
 
+def _encode_generations_cursor(generation: dict) -> str:
+    """Build the pagination cursor pointing past the given generation."""
+    created_at = generation["created_at"]
+    if created_at.tzinfo is not None:
+        # Keep the cursor free of "+00:00", which is not safe in a query string
+        created_at = created_at.astimezone(UTC).replace(tzinfo=None)
+    return f"{created_at.isoformat()},{generation['_id']}"
+
+
+def _decode_generations_cursor(cursor: str) -> dict:
+    """Turn a pagination cursor into a filter for the generations after it."""
+    created_at, _, generation_id = cursor.rpartition(",")
+    try:
+        created_at = datetime.fromisoformat(created_at)
+    except ValueError:
+        created_at = None
+    if created_at is None or not ObjectId.is_valid(generation_id):
+        raise HTTPException(status_code=422, detail="Invalid pagination cursor.")
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": ObjectId(generation_id)}},
+        ]
+    }
+
+
 @router.get("/generations")
-async def get_image_generations():
-    """Retrieve all image generations from the database."""
+async def get_image_generations(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    before: Optional[str] = Query(None),
+):
+    """Retrieve image generations from the database, newest first.
+
+    Without ``limit`` every generation is returned. With it, pass the
+    ``next_cursor`` of a response as ``before`` to fetch the following page.
+    """
+    db = get_database(DB_NAME)
+    query = _decode_generations_cursor(before) if before else {}
     try:
-        generations = await db.images.find(
-            {}, {"_id": 1, "output_url": 1, "created_at": 1}
-        ).to_list(length=None)
+        cursor = (
+            get_str_id_collection(db, "images")
+            .find(query, IMAGE_LIST_PROJECTION)
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit or 0)
+            .batch_size(500)
+        )
+
+        generations = [generation async for generation in cursor]
+
         if not generations:
             return {
                 "message": "No image generations found.",
                 "success": True,
                 "generations": [],
+                "next_cursor": None,
             }
 
-        # Convert ObjectId to string and format the created_at field
-        for generation in generations:
-            generation["_id"] = str(generation["_id"])
+        next_cursor = None
+        if limit and len(generations) == limit:
+            next_cursor = _encode_generations_cursor(generations[-1])
 
-        # Return the list of generations
-        generations.sort(key=lambda x: x["created_at"], reverse=True)
-        return {"generations": generations, "success": True}
+        return {"generations": generations, "success": True, "next_cursor": next_cursor}
     except PyMongoError as e:
         return {
             "message": f"Error retrieving image generations: {str(e)}",
@@ -300,13 +371,15 @@ async def get_image_generations():
 
 
 @router.get("/delete/{generation_id}")
-async def delete_image_generation(generation_id: str):
+async def delete_image_generation(generation_id: PyObjectId):
     """Delete an image generation by ID."""
+    db = get_database(DB_NAME)
     try:
-        object_id = ObjectId(generation_id)
-        result = await db.images.delete_one({"_id": object_id})
+        deleted = await db.images.find_one_and_delete(
+            {"_id": generation_id}, projection={"_id": 1}
+        )
 
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Image generation not found.")
 
         return {"message": "Image generation deleted successfully.", "success": True}
@@ -1,23 +1,45 @@
 """Insta Scraper API"""
 
-import os
 from fastapi import APIRouter, HTTPException
-import requests
-from dotenv import load_dotenv
+import httpx
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from helpers.config import RAPID_API_KEY
 from helpers.db import get_database
-
-load_dotenv()
+from helpers.object_id import get_str_id_collection
 
 router = APIRouter()
 
-RAPID_API_KEY = os.getenv("RAPID_API_KEY")
+DB_NAME = "insta_scraper"
+
+# Shared HTTP client so connections to RapidAPI are kept alive between requests
+http_client = httpx.AsyncClient(timeout=60.0)
+
+
+async def create_indexes():
+    """Create the indexes used by the Instagram scraper routes."""
+    db = get_database(DB_NAME)
+    try:
+        # Only string usernames are indexed, so documents without one don't
+        # collide on null
+        await db.users.create_index(
+            "username",
+            unique=True,
+            partialFilterExpression={"username": {"$type": "string"}},
+        )
+    except PyMongoError as e:
+        # Existing duplicate usernames make the build fail; keep serving anyway
+        print(f"Warning: could not create Instagram scraper indexes: {e}")
 
-db = get_database("insta_scraper")
+
+async def close_http_client():
+    """Close the shared HTTP client."""
+    await http_client.aclose()
 
 
 @router.get("/users/add/{username}", response_model=dict)
 async def add_user_to_db(username: str):
     """Add user data to the database by username."""
+    db = get_database(DB_NAME)
     try:
         if not RAPID_API_KEY:
             raise HTTPException(
@@ -25,9 +47,10 @@ async def add_user_to_db(username: str):
                 detail="RAPID_API_KEY is not set in the environment variables.",
             )
 
-        user_data = await db.users.find_one({"username": username})
+        # Skip the RapidAPI call when the user is already stored
+        existing = await db.users.find_one({"username": username}, {"_id": 1})
 
-        if user_data:
+        if existing:
             return {
                 "username": username,
                 "message": "User data already exists in the database.",
@@ -42,41 +65,64 @@ async def add_user_to_db(username: str):
             "x-rapidapi-host": "instagram-scrapper-posts-reels-stories-downloader.p.rapidapi.com",
         }
 
-        response = requests.get(url, headers=headers, params=querystring, timeout=60000)
+        response = await http_client.get(url, headers=headers, params=querystring)
 
+        # Never store an error page or error payload as the user's profile
+        response.raise_for_status()
         api_data = response.json()
+        if not isinstance(api_data, dict):
+            raise ValueError("Unexpected response format from RapidAPI")
 
-        # Insert or update user data in MongoDB
+        # Insert the user data unless a concurrent request already stored it
+        result = await db.users.update_one(
+            {"username": username}, {"$setOnInsert": api_data}, upsert=True
+        )
 
-        await db.users.insert_one(api_data)
+        if result.upserted_id is None:
+            return {
+                "username": username,
+                "message": "User data already exists in the database.",
+            }
 
         return {
             "usename": username,
             "message": "User data retrieved successfully",
         }
 
-    except requests.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
+        # ValueError covers bodies that are not JSON
         return {
             "username": username,
             "message": f"Error retrieving user data: {str(e)}",
             "status_code": 500,
         }
+    except DuplicateKeyError:
+        # A concurrent request upserted the same username first
+        return {
+            "username": username,
+            "message": "User data already exists in the database.",
+        }
+    except PyMongoError as e:
+        return {
+            "username": username,
+            "message": f"Database error: {str(e)}",
+            "status_code": 500,
+        }
 
 
 @router.get("/users/{username}", response_model=dict)
 async def get_user(username: str):
     """Get User Data from the database by username."""
+    db = get_database(DB_NAME)
     try:
-        user_data = await db.users.find_one({"username": username})
+        users = get_str_id_collection(db, "users")
+        user_data = await users.find_one({"username": username})
 
         if not user_data:
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Convert _id to string for JSON serialization
-        user_data["_id"] = str(user_data["_id"])
-
         return user_data
-    except requests.RequestException as e:
+    except PyMongoError as e:
         return {
             "username": username,
             "message": f"Error retrieving user data: {str(e)}",
@@ -1,14 +1,25 @@
 """Movies API Routes"""
 
 from typing import List, Optional
+import orjson
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from bson import ObjectId
 from helpers.db import get_database
+from helpers.object_id import PyObjectId, get_str_id_collection
 
 router = APIRouter()
 
-db = get_database("sample_mflix")
+DB_NAME = "sample_mflix"
+
+MOVIE_PROJECTION = {
+    "_id": 1,
+    "title": 1,
+    "directors": 1,
+    "year": 1,
+    "genres": 1,
+    "cast": 1,
+}
 
 
 class Movie(BaseModel):
@@ -22,32 +33,51 @@ class Movie(BaseModel):
     cast: Optional[List[str]]
 
 
-@router.get("/movies", response_model=List[Movie])
+async def _stream_movies(first_doc, cursor):
+    """Yield the cursor's documents as a JSON array, one document at a time.
+
+    The headers have already been sent by the time this runs, so an error
+    raised by the cursor here ends the response with truncated JSON.
+    """
+    yield b"["
+    if first_doc is not None:
+        yield orjson.dumps(first_doc)
+        async for doc in cursor:
+            yield b"," + orjson.dumps(doc)
+    yield b"]"
+
+
+@router.get(
+    "/movies",
+    response_class=StreamingResponse,
+    responses={200: {"model": List[Movie]}},
+)
 async def get_movies():
     """Get all movies"""
-    cursor = db.movies.find(
-        {}, {"_id": 1, "title": 1, "directors": 1, "year": 1, "genres": 1, "cast": 1}
-    ).limit(100)
+    db = get_database(DB_NAME)
+    movies = get_str_id_collection(db, "movies")
+    cursor = movies.find({}, MOVIE_PROJECTION).limit(100)
 
-    movies = []
-    async for doc in cursor:
-        doc["_id"] = str(doc["_id"])  # Convert ObjectId to string
-        movies.append(doc)
+    # Fetch the first batch before streaming so connection errors still
+    # produce an error status instead of a truncated 200 response
+    try:
+        first_doc = await anext(cursor)
+    except StopAsyncIteration:
+        first_doc = None
 
-    return movies
+    return StreamingResponse(
+        _stream_movies(first_doc, cursor), media_type="application/json"
+    )
 
 
 @router.get("/movies/{movie_id}", response_model=Movie)
-async def get_movie(movie_id: str):
+async def get_movie(movie_id: PyObjectId):
     """Get a movie by ID"""
-    object_id = ObjectId(movie_id)
-    movie = await db.movies.find_one(
-        {"_id": object_id},
-        {"_id": 1, "title": 1, "directors": 1, "year": 1, "genres": 1, "cast": 1},
-    )
+    db = get_database(DB_NAME)
+    movies = get_str_id_collection(db, "movies")
+    movie = await movies.find_one({"_id": movie_id}, MOVIE_PROJECTION)
 
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    movie["_id"] = str(movie["_id"])  # Convert ObjectId to string for Pydantic
     return movie